@@ -1,11 +1,13 @@
 import os
 import time
 import requests
-import glob
+from requests.adapters import HTTPAdapter
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import xml.etree.ElementTree as ET
 from pathlib import Path
 import math
-from collections import Counter
+import re
 from datetime import datetime
 import gzip
 import tempfile
@@ -13,6 +15,16 @@ import tempfile
 CONFIG_FILE = "strava_config.txt"
 UPLOADED_LOG = "uploaded_activities.txt"
 API_BASE = "https://www.strava.com"
+UPLOAD_EXTENSIONS = (".gpx", ".tcx", ".fit", ".fit.gz", ".tcx.gz", ".gpx.gz")
+UPLOAD_WORKERS = 4
+# Limit API Stravy: 100 zapytań na 15 minut
+RATE_LIMIT_WINDOW = 15 * 60
+RATE_LIMIT = threading.BoundedSemaphore(100)
+EARTH_RADIUS = 6371000
+
+# Jedna sesja HTTP dla wszystkich zapytań - ponowne użycie połączeń TLS (keep-alive)
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
 
 ACTIVITY_MAP = {
     "ride": ["ride", "bike", "bicycle", "cycling", "rower", "rad", "velo", "mtb", "roadbike"],
@@ -23,6 +35,19 @@ ACTIVITY_MAP = {
     "workout": ["workout", "training", "gym", "fitness", "strength", "hiit"],
 }
 
+# Słowo kluczowe -> aktywność, wszystkie słowa w jednym wyrażeniu regularnym.
+# Lookahead zwraca dopasowania na każdej pozycji, także nakładające się.
+KEYWORD_ACTIVITY = {k: act for act, keywords in ACTIVITY_MAP.items() for k in keywords}
+KEYWORD_PATTERN = re.compile("(?=(" + "|".join(map(re.escape, KEYWORD_ACTIVITY)) + "))")
+
+# Najczęstsze pola metadanych spotykane w GPX (test 1)
+META_TAGS = {"activity", "sport", "type", "activitytype", "tracktype", "keywords"}
+# Pola, które same rozstrzygają o typie aktywności
+DECISIVE_META_TAGS = {"sport", "activitytype"}
+
+# Pola tekstowe przeszukiwane w teście 2
+TEXT_TAGS = {"name", "desc", "cmt", "keywords"}
+
 NORMALIZED_OUTPUT = {
     "ride": "Ride",
     "run": "Run",
@@ -51,25 +76,28 @@ def save_config(config):
             f.write(f"{k}={v}\n")
 
 # ----------------- Uploaded activities tracking -----------------
-def is_already_uploaded(filename, filesize):
-    """Check if file was already uploaded"""
+def load_uploaded_set():
+    """Return the set of logged name+size keys"""
     if not os.path.exists(UPLOADED_LOG):
-        return False
+        return set()
     with open(UPLOADED_LOG, "r") as f:
-        for line in f:
-            if line.strip() == f"{filename}+{filesize}":
-                return True
-    return False
+        return set(line.strip() for line in f)
 
-def log_uploaded_file(filepath):
+def log_uploaded_file(filepath, filesize, uploaded):
     """Log successfully uploaded file to prevent re-uploading"""
     filename = os.path.basename(filepath)
-    filesize = os.path.getsize(filepath)
+    key = f"{filename}+{filesize}"
     
     with open(UPLOADED_LOG, "a") as f:
-        f.write(f"{filename}+{filesize}\n")
+        f.write(f"{key}\n")
+    uploaded.add(key)
     
-    print(f"📝 Logged to {UPLOADED_LOG}: {filename}+{filesize}")
+    print(f"📝 Logged to {UPLOADED_LOG}: {key}")
+
+# ----------------- Authorization header -----------------
+def set_auth_header(config):
+    """Set the bearer token header on SESSION"""
+    SESSION.headers["Authorization"] = f"Bearer {config['access_token']}"
 
 # ----------------- Tutorial setup -----------------
 def tutorial_setup():
@@ -93,7 +121,7 @@ def tutorial_setup():
         code = code.split("code=")[1]
     code = code.split("&")[0]
 
-    r = requests.post(
+    r = SESSION.post(
         f"{API_BASE}/oauth/token",
         data={
             "client_id": client_id,
@@ -124,7 +152,7 @@ def tutorial_setup():
 # ----------------- Refresh token -----------------
 def refresh_token(config):
     print("🔄 Refreshing access token...")
-    r = requests.post(
+    r = SESSION.post(
         f"{API_BASE}/oauth/token",
         data={
             "client_id": config["client_id"],
@@ -138,6 +166,7 @@ def refresh_token(config):
     config["refresh_token"] = data["refresh_token"]
     config["expires_at"] = str(data["expires_at"])
     save_config(config)
+    set_auth_header(config)
     print("✅ Token refreshed successfully")
 
 # ----------------- Check token expiry -----------------
@@ -148,13 +177,18 @@ def check_token(config):
 
 # ----------------- Determine activity type -----------------
 
-def haversine(lat1, lon1, lat2, lon2):
-    R = 6371000
-    phi1, phi2 = math.radians(lat1), math.radians(lat2)
-    dphi = math.radians(lat2 - lat1)
-    dlambda = math.radians(lon2 - lon1)
-    a = math.sin(dphi/2)**2 + math.cos(phi1)*math.cos(phi2)*math.sin(dlambda/2)**2
-    return 2 * R * math.atan2(math.sqrt(a), math.sqrt(1-a))
+def match_activity(text):
+    """Return the first activity from ACTIVITY_MAP with a keyword in text, or 0"""
+    found = {KEYWORD_ACTIVITY[k] for k in KEYWORD_PATTERN.findall(text)}
+    for act in ACTIVITY_MAP:
+        if act in found:
+            return act
+    return 0
+
+
+def parse_gpx_time(text):
+    """Parse a GPX ISO 8601 timestamp (with trailing Z)"""
+    return datetime.fromisoformat(text.replace("Z", "+00:00"))
 
 
 def normalize_activity(label):
@@ -164,35 +198,125 @@ def normalize_activity(label):
     return NORMALIZED_OUTPUT.get(label, "Other")
 
 
-def test_metadata(root):
+def scan_gpx(filepath):
+    """Stream the GPX file once and return the inputs of all three tests as a dict"""
+    scan = {
+        "meta_hits": [],
+        "text_blob": "",
+        "has_depth": False,
+        "points": 0,
+        "t_first": None,
+        # Kandydaci na koniec trasy: (czas, dystans do tego punktu), ostatni i przedostatni
+        "ends": [],
+    }
+    texts = []
+    # Otwarte elementy (rodzice) i czas bieżącego punktu trasy
+    stack = []
+    point_time = None
+    # Dystans liczony w locie (przybliżenie równoodległościowe, wystarcza do
+    # progów prędkości): różnice w stopniach, zamiana na radiany raz na końcu
+    cos, sqrt = math.cos, math.sqrt
+    half_deg_to_rad = math.pi / 360
+    dist_deg = 0.0
+    prev_lat = prev_lon = None
+    last_end = prev_end = None
+    # Rozstrzygające pole sport / activitytype - test 3 nie będzie potrzebny
+    decisive = False
+
+    for event, elem in ET.iterparse(filepath, events=("start", "end")):
+        if event == "start":
+            stack.append(elem)
+            continue
+        stack.pop()
+        local = elem.tag.rpartition("}")[2].lower()
+
+        if local == "trkpt":
+            # Test 3: punkty trasy
+            lat = elem.attrib.get("lat")
+            lon = elem.attrib.get("lon")
+            if lat and lon and point_time and not decisive:
+                try:
+                    lat, lon = float(lat), float(lon)
+                    if scan["t_first"] is None:
+                        # Punkty przed pierwszym poprawnym czasem są pomijane
+                        scan["t_first"] = parse_gpx_time(point_time)
+                except ValueError:
+                    pass
+                else:
+                    if prev_lat is not None:
+                        # Przejście przez południk 180° - najkrótsza różnica długości
+                        dlon = lon - prev_lon
+                        if dlon > 180:
+                            dlon -= 360
+                        elif dlon < -180:
+                            dlon += 360
+                        x = dlon * cos((lat + prev_lat) * half_deg_to_rad)
+                        y = lat - prev_lat
+                        dist_deg += sqrt(x*x + y*y)
+                    prev_lat, prev_lon = lat, lon
+                    scan["points"] += 1
+                    # Dalsze czasy zostają tekstem - parsowany jest tylko koniec trasy;
+                    # dystans zapamiętany razem z czasem, żeby pasował do użytego końca
+                    prev_end, last_end = last_end, (point_time, dist_deg)
+            point_time = None
+        elif local == "time":
+            # Czas punktu odczytany tutaj, bo element jest zwalniany przed końcem trkpt
+            if stack and stack[-1].tag.rpartition("}")[2].lower() == "trkpt":
+                point_time = elem.text
+        else:
+            # Test 2: pola tekstowe
+            if local in TEXT_TAGS and elem.text:
+                texts.append(elem.text.lower())
+
+            if "depth" in local:
+                # Test 3: depth (pływanie)
+                scan["has_depth"] = True
+            elif local in META_TAGS:
+                # Test 1: pole metadanych - dopiero teraz tekst jest zamieniany na małe litery
+                text = (elem.text or "").lower()
+                scan["meta_hits"].append((local, text))
+                if local in DECISIVE_META_TAGS and match_activity(text):
+                    decisive = True
+
+        # Element przetworzony - zwolnij go i odłącz od rodzica,
+        # żeby drzewo nie rosło razem z plikiem
+        elem.clear()
+        if stack:
+            del stack[-1][:]
+
+    scan["text_blob"] = " ".join(texts)
+    scan["ends"] = [
+        (end[0], EARTH_RADIUS * math.radians(end[1]))
+        for end in (last_end, prev_end) if end is not None
+    ]
+    return scan
+
+
+def test_metadata(scan):
     """
     Test 1:
     Szukanie jednoznacznych metadanych w extensions:
     Garmin, Strava, Locus, Polar, Suunto, GPX generic
+    Zwraca (aktywność, pewność) - "high" dla pól sport / activitytype.
     """
-    candidates = []
+    # Najpierw pola rozstrzygające, niezależnie od kolejności w pliku
+    for tag, text in scan["meta_hits"]:
+        if tag in DECISIVE_META_TAGS:
+            act = match_activity(text)
+            if act:
+                print(f"[META] Detected {act} from {tag} metadata")
+                return act, "high"
 
-    for elem in root.iter():
-        tag = elem.tag.lower()
-        text = (elem.text or "").lower()
+    for tag, text in scan["meta_hits"]:
+        act = match_activity(text)
+        if act:
+            print(f"[META] Detected {act} from metadata")
+            return act, "low"
 
-        # Najczęstsze pola spotykane w GPX
-        if any(k in tag for k in [
-            "activity", "sport", "type", "activitytype",
-            "tracktype", "keywords"
-        ]):
-            candidates.append(text)
+    return 0, "low"
 
-    for text in candidates:
-        for act, keywords in ACTIVITY_MAP.items():
-            if any(k in text for k in keywords):
-                print(f"[META] Detected {act} from metadata")
-                return act
 
-    return 0
-
-
-def test_keywords(root):
+def test_keywords(scan):
     """
     Test 2:
     Szukanie słów kluczowych w:
@@ -201,39 +325,15 @@ def test_keywords(root):
     - cmt
     - keywords
     """
-    texts = []
-
-    for tag in ["name", "desc", "cmt", "keywords"]:
-        for el in root.findall(f".//{{*}}{tag}"):
-            if el.text:
-                texts.append(el.text.lower())
-
-    blob = " ".join(texts)
-
-    for act, keywords in ACTIVITY_MAP.items():
-        if any(k in blob for k in keywords):
-            print(f"[KEYWORD] Detected {act} from text")
-            return act
+    act = match_activity(scan["text_blob"])
+    if act:
+        print(f"[KEYWORD] Detected {act} from text")
+        return act
 
     return 0
 
 
-def extract_points(root):
-    points = []
-    for trkpt in root.findall(".//{*}trkpt"):
-        lat = trkpt.attrib.get("lat")
-        lon = trkpt.attrib.get("lon")
-        time_el = trkpt.find("{*}time")
-        if lat and lon and time_el is not None:
-            try:
-                t = datetime.fromisoformat(time_el.text.replace("Z", "+00:00"))
-                points.append((float(lat), float(lon), t))
-            except:
-                pass
-    return points
-
-
-def test_data(root):
+def test_data(scan):
     """
     Test 3:
     Heurystyka na podstawie:
@@ -243,23 +343,28 @@ def test_data(root):
     - presence depth (pływanie)
     """
     # Swim: depth / pool data
-    for elem in root.iter():
-        if "depth" in elem.tag.lower():
-            print("[DATA] Detected Swim from depth data")
-            return "swim"
+    if scan["has_depth"]:
+        print("[DATA] Detected Swim from depth data")
+        return "swim"
 
-    points = extract_points(root)
-    if len(points) < 10:
+    if scan["points"] < 10:
         return 0
 
-    total_dist = 0
-    total_time = (points[-1][2] - points[0][2]).total_seconds()
+    # Koniec trasy: ostatni poprawny czas z dwóch ostatnich punktów, razem z dystansem
+    # do tego samego punktu; jeśli oba są błędne - test się wstrzymuje
+    t_start = scan["t_first"]
+    t_end = None
+    for candidate, distance in scan["ends"]:
+        try:
+            t_end = parse_gpx_time(candidate)
+            total_dist = distance
+            break
+        except ValueError:
+            pass
+    if t_end is None:
+        return 0
 
-    for i in range(1, len(points)):
-        total_dist += haversine(
-            points[i-1][0], points[i-1][1],
-            points[i][0], points[i][1]
-        )
+    total_time = (t_end - t_start).total_seconds()
 
     if total_time <= 0:
         return 0
@@ -286,23 +391,32 @@ def test_data(root):
 
 
 def determine_gpx_activity(filepath):
-    tree = ET.parse(filepath)
-    root = tree.getroot()
+    scan = scan_gpx(filepath)
 
-    r1 = test_metadata(root)
-    r2 = test_keywords(root)
-    r3 = test_data(root)
+    r1, confidence = test_metadata(scan)
+    if confidence == "high":
+        # Pole sport / activitytype jest rozstrzygające - scan_gpx pominął już dystans,
+        # testy 2 i 3 nie są potrzebne
+        print(f"[FINAL] Decisive metadata: {r1}")
+        return normalize_activity(r1)
 
-    results = [r for r in [r1, r2, r3] if r != 0]
+    r2 = test_keywords(scan)
+    r3 = test_data(scan)
 
-    if results:
-        counter = Counter(results)
-        best, votes = counter.most_common(1)[0]
+    if r1 != 0 or r2 != 0 or r3 != 0:
         print(f"  test1={r1}, test2={r2}, test3={r3}")
-        
-        if votes >= 2:
-            print(f"[FINAL] Majority vote: {best}")
-            return normalize_activity(best)
+
+    # Większość: co najmniej dwa zgodne testy
+    if r1 != 0 and (r1 == r2 or r1 == r3):
+        best = r1
+    elif r2 != 0 and r2 == r3:
+        best = r2
+    else:
+        best = 0
+
+    if best != 0:
+        print(f"[FINAL] Majority vote: {best}")
+        return normalize_activity(best)
 
     # Fallback: kolejno 1 → 2 → 3
     for r in [r1, r2, r3]:
@@ -322,13 +436,14 @@ def upload_file(config):
         return
     
     # Check if already uploaded
+    uploaded = load_uploaded_set()
     filesize = os.path.getsize(path)
     filenamewithext = os.path.basename(path)
-    if is_already_uploaded(filenamewithext, filesize):
-        print(f"⚠ File already uploaded: {idx}/{len(files)}: {os.path.basename(path)}")
+    if f"{filenamewithext}+{filesize}" in uploaded:
+        print(f"⚠ File already uploaded: {os.path.basename(path)}")
         return
     else:
-        print(f"\nUploading file {idx}/{len(files)}: {os.path.basename(path)}")
+        print(f"\nUploading file: {os.path.basename(path)}")
     
     # Get filename without extension for title
     filename = os.path.splitext(os.path.basename(path))[0]
@@ -348,9 +463,8 @@ def upload_file(config):
     
     try:
         with open(path, "rb") as f:
-            r = requests.post(
+            r = SESSION.post(
                 f"{API_BASE}/api/v3/uploads",
-                headers={"Authorization": f"Bearer {config['access_token']}"},
                 files={"file": f},
                 data={
                     "data_type": data_type,
@@ -365,7 +479,7 @@ def upload_file(config):
         print(response)
         
         if "id" in response or "activity_id" in response:
-            log_uploaded_file(path)
+            log_uploaded_file(path, filesize, uploaded)
             print("✅ File successfully uploaded and logged!")
         
     except Exception as e:
@@ -376,146 +490,169 @@ def check_upload_status(config):
     upload_id = input("Upload ID: ").strip()
     check_token(config)
 
-    r = requests.get(
-        f"{API_BASE}/api/v3/uploads/{upload_id}",
-        headers={"Authorization": f"Bearer {config['access_token']}"},
-    )
+    r = SESSION.get(f"{API_BASE}/api/v3/uploads/{upload_id}")
 
     print("📊 Upload status:")
     print(r.json())
 
 # ----------------- Bulk folder upload -----------------
+def take_rate_limit_token():
+    """Block until a request fits in Strava's rate limit window"""
+    if not RATE_LIMIT.acquire(blocking=False):
+        print(f"⏳ Strava rate limit reached, waiting up to {RATE_LIMIT_WINDOW // 60} minutes...")
+        RATE_LIMIT.acquire()
+    # Token wraca do puli po upływie okna limitu
+    timer = threading.Timer(RATE_LIMIT_WINDOW, RATE_LIMIT.release)
+    timer.daemon = True
+    timer.start()
+
+def classify_file(path):
+    """Activity type for upload: detected from GPX content, Workout for other formats"""
+    if os.path.splitext(path)[1].lower() == ".gpx":
+        return determine_gpx_activity(path)
+    return "Workout"
+
+def upload_one(path, activity_type, idx, total):
+    """Upload a single file from a folder, returns Strava response"""
+    # Get filename without extension for title
+    filename = os.path.splitext(os.path.basename(path))[0]
+    description = ""
+    
+    # Get extension
+    ext = os.path.splitext(path)[1].lower()
+
+    # Sprawdź czy plik jest skompresowany gzip
+    is_gzipped = ext == '.gz'
+    
+    # Określ typ danych na podstawie nazwy pliku
+    if is_gzipped:
+        # Pobierz podstawowe rozszerzenie (przed .gz)
+        base_name = os.path.splitext(path)[0]  # usuwa .gz
+        base_ext = os.path.splitext(base_name)[1].lower()
+        
+        if base_ext == ".gpx":
+            data_type = "gpx"
+        elif base_ext == ".tcx":
+            data_type = "tcx"
+        elif base_ext == ".fit":
+            data_type = "fit"
+        else:
+            data_type = "gpx"  # domyślny
+    else:
+        # Oryginalna logika dla nieskompresowanych plików
+        if ext in [".gpx"]:
+            data_type = "gpx"
+        elif ext in [".tcx"]:
+            data_type = "tcx"
+        elif ext in [".fit"]:
+            data_type = "fit"
+        else:
+            data_type = "gpx"
+
+    take_rate_limit_token()
+    print(f"\nUploading file {idx}/{total}: {os.path.basename(path)}")
+
+    if is_gzipped:
+        # Rozpakuj plik .gz do tymczasowego pliku
+        with gzip.open(path, 'rb') as gz_file:
+            file_content = gz_file.read()
+            
+        # Użyj tymczasowego pliku do uploadu
+        with tempfile.NamedTemporaryFile(mode='wb', delete=False, suffix=base_ext) as tmp_file:
+            tmp_file.write(file_content)
+            tmp_path = tmp_file.name
+        
+        try:
+            with open(tmp_path, "rb") as f:
+                r = SESSION.post(
+                    f"{API_BASE}/api/v3/uploads",
+                    files={"file": f},
+                    data={
+                        "data_type": data_type,
+                        "name": os.path.splitext(filename)[0],  # usuń .gz z nazwy
+                        "description": description,
+                        "activity_type": activity_type
+                    },
+                )
+        finally:
+            # Posprzątaj tymczasowy plik
+            os.unlink(tmp_path)
+    else:
+        # Oryginalny kod dla nieskompresowanych plików
+        with open(path, "rb") as f:
+            r = SESSION.post(
+                f"{API_BASE}/api/v3/uploads",
+                files={"file": f},
+                data={
+                    "data_type": data_type,
+                    "name": filename,
+                    "description": description,
+                    "activity_type": activity_type
+                },
+            )
+
+    return r.json()
+
 def upload_folder(config):
     folder_path = input("Path to folder containing GPX/TCX/FIT files: ").strip()
     if not os.path.exists(folder_path):
         print("❌ Folder does not exist!")
         return
 
-    extensions = ("*.gpx", "*.tcx", "*.fit", "*.fit.gz", "*.tcx.gz", "*.gpx.gz")
-    files = []
-    for ext in extensions:
-        files.extend(glob.glob(os.path.join(folder_path, ext)))
+    with os.scandir(folder_path) as entries:
+        files = [
+            # (ścieżka, rozmiar) - rozmiar jest częścią klucza w logu wysłanych plików
+            (entry.path, entry.stat().st_size) for entry in entries
+            # Pomijamy ukryte pliki (np. ._*.fit z macOS)
+            if not entry.name.startswith(".") and entry.is_file()
+            and entry.name.lower().endswith(UPLOAD_EXTENSIONS)
+        ]
 
     if not files:
         print("❌ No GPX/TCX/FIT files found in folder.")
         return
 
-    print(f"📂 Found {len(files)} files. Starting upload with 6s delay...")
+    print(f"📂 Found {len(files)} files. Starting upload with {UPLOAD_WORKERS} parallel uploads...")
+
+    uploaded = load_uploaded_set()
+    check_token(config)
 
-    for idx, path in enumerate(files, start=1):
+    # Klasyfikacja w głównym wątku, przed uploadem - logi testów nie mieszają się między plikami
+    to_upload = []
+    for idx, (path, filesize) in enumerate(files, start=1):
         # Check if already uploaded
-        filesize = os.path.getsize(path)
         filenamewithext = os.path.basename(path)
-        if is_already_uploaded(filenamewithext, filesize):
+        if f"{filenamewithext}+{filesize}" in uploaded:
             print(f"⚠ File already uploaded: {idx}/{len(files)}: {os.path.basename(path)}")
             continue
-        else:
-            print(f"\nUploading file {idx}/{len(files)}: {os.path.basename(path)}")
-
-
-        # Get filename without extension for title
-        filename = os.path.splitext(os.path.basename(path))[0]
-        description = ""
-        
-        # Get extension
-        ext = os.path.splitext(path)[1].lower()
-
-        # Determine activity type from file
-        if ext == ".gpx":
-            data_type = "gpx"
-            activity_type = determine_gpx_activity(path)
-        else:
-            data_type = ext.lstrip(".")
-            activity_type = "Workout"
-    
-        # Sprawdź czy plik jest skompresowany gzip
-        is_gzipped = ext == '.gz'
-        
-        # Określ typ danych na podstawie nazwy pliku
-        if is_gzipped:
-            # Pobierz podstawowe rozszerzenie (przed .gz)
-            base_name = os.path.splitext(path)[0]  # usuwa .gz
-            base_ext = os.path.splitext(base_name)[1].lower()
-            
-            if base_ext == ".gpx":
-                data_type = "gpx"
-            elif base_ext == ".tcx":
-                data_type = "tcx"
-            elif base_ext == ".fit":
-                data_type = "fit"
-            else:
-                data_type = "gpx"  # domyślny
-        else:
-            # Oryginalna logika dla nieskompresowanych plików
-            if ext in [".gpx"]:
-                data_type = "gpx"
-            elif ext in [".tcx"]:
-                data_type = "tcx"
-            elif ext in [".fit"]:
-                data_type = "fit"
-            else:
-                data_type = "gpx"
 
+        print(f"\n🔍 Classifying file {idx}/{len(files)}: {os.path.basename(path)}")
         try:
-            if is_gzipped:
-                # Rozpakuj plik .gz do tymczasowego pliku
-                with gzip.open(path, 'rb') as gz_file:
-                    file_content = gz_file.read()
-                    
-                # Użyj tymczasowego pliku do uploadu
-                with tempfile.NamedTemporaryFile(mode='wb', delete=False, suffix=base_ext) as tmp_file:
-                    tmp_file.write(file_content)
-                    tmp_path = tmp_file.name
-                
-                try:
-                    with open(tmp_path, "rb") as f:
-                        r = requests.post(
-                            f"{API_BASE}/api/v3/uploads",
-                            headers={"Authorization": f"Bearer {config['access_token']}"},
-                            files={"file": f},
-                            data={
-                                "data_type": data_type,
-                                "name": os.path.splitext(filename)[0],  # usuń .gz z nazwy
-                                "description": description,
-                                "activity_type": activity_type
-                            },
-                        )
-                finally:
-                    # Posprzątaj tymczasowy plik
-                    os.unlink(tmp_path)
-            else:
-                # Oryginalny kod dla nieskompresowanych plików
-                with open(path, "rb") as f:
-                    r = requests.post(
-                        f"{API_BASE}/api/v3/uploads",
-                        headers={"Authorization": f"Bearer {config['access_token']}"},
-                        files={"file": f},
-                        data={
-                            "data_type": data_type,
-                            "name": filename,
-                            "description": description,
-                            "activity_type": activity_type
-                        },
-                    )
-            
-            response = r.json()
-            print("📤 Upload response:")
-            print(response)
-            
-            if "id" in response or "activity_id" in response:
-                log_uploaded_file(path)
-                print("✅ File successfully uploaded and logged!")
-
-            print("⏳ Waiting 2 seconds...")
-            print("\n")
-            time.sleep(2)
-            
+            activity_type = classify_file(path)
         except Exception as e:
-            print(f"❌ Error uploading {path}: {e}")
-
-
+            print(f"❌ Error reading {path}: {e}")
+            continue
+        to_upload.append((idx, path, filesize, activity_type))
 
+    with ThreadPoolExecutor(max_workers=UPLOAD_WORKERS) as executor:
+        futures = {}
+        for idx, path, filesize, activity_type in to_upload:
+            future = executor.submit(upload_one, path, activity_type, idx, len(files))
+            futures[future] = (path, filesize)
 
+        for future in as_completed(futures):
+            path, filesize = futures[future]
+            try:
+                response = future.result()
+                print(f"📤 Upload response for {os.path.basename(path)}:")
+                print(response)
+                
+                if "id" in response or "activity_id" in response:
+                    log_uploaded_file(path, filesize, uploaded)
+                    print("✅ File successfully uploaded and logged!")
+                
+            except Exception as e:
+                print(f"❌ Error uploading {path}: {e}")
 
     print("\n✅ All files processed.")
 
@@ -557,6 +694,7 @@ def main():
     if not all(k in config and config[k] for k in required_keys):
         config = tutorial_setup()
 
+    set_auth_header(config)
     menu(config)
 
 if __name__ == "__main__":